@@ -3,28 +3,241 @@ Area enrichment - gather amenities, nature data, etc.
 Uses OpenStreetMap Overpass API (free) or Google Places.
 
 Features:
-- Retry with exponential backoff for failed API calls
+- Retry with jittered exponential backoff for failed API calls
 - Handles rate limiting (429), server errors (500, 502, 503)
+- Circuit breakers fail fast when an upstream is down
 - Returns empty data gracefully when APIs fail
 - Logs all operations with timestamps
 """
 
+import atexit
+import hashlib
+import heapq
 import os
+import random
+import string
+import threading
 import time
 import logging
+from collections import deque
+from email.utils import parsedate_to_datetime
+from math import radians, sin, cos, sqrt, atan2
+from operator import itemgetter
+from pathlib import Path
 from typing import Optional, Callable, Any
 
 import httpx
+import orjson
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+
+def make_http_client(timeout: float, max_connections: int = 8) -> httpx.Client:
+    """
+    Create a pooled HTTP/2 client that is closed at exit.
+
+    Each upstream API gets its own client (bulkhead), so an outage that ties
+    up one pool can't starve calls to the others.
+    """
+    client = httpx.Client(
+        http2=True,
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        ),
+    )
+    atexit.register(client.close)
+    return client
+
+
+# One connection pool per upstream API
+_overpass_client = make_http_client(timeout=60)
+_police_client = make_http_client(timeout=30)
+
 # Overpass API endpoints (with fallbacks)
 OVERPASS_ENDPOINTS = [
     "https://overpass-api.de/api/interpreter",
     "https://overpass.kumi.systems/api/interpreter",
 ]
 
+EARTH_RADIUS_M = 6371000
+
+# Raw API responses are cached on disk so re-runs skip the network
+CACHE_DIR = Path(__file__).parent.parent / "data" / "cache"
+RESPONSE_CACHE_TTL = 7 * 86400  # 7 days
+
+# Query coordinates are rounded to this many decimal places (~100m) so
+# lookups for nearby points hit the same cache entry
+CACHE_COORD_PRECISION = 3
+
+
+def _quantize(lat: float, lng: float) -> tuple:
+    """Round coordinates for use in cacheable API queries."""
+    return round(lat, CACHE_COORD_PRECISION), round(lng, CACHE_COORD_PRECISION)
+
+
+def _response_cache_file(kind: str, key: str) -> Path:
+    """Path of the cache file for an API response."""
+    digest = hashlib.sha1(key.encode()).hexdigest()
+    return CACHE_DIR / f"{kind}_{digest}.json"
+
+
+def _load_cached_response(kind: str, key: str) -> Optional[Any]:
+    """Return a cached API response, or None if missing or expired."""
+    cache_file = _response_cache_file(kind, key)
+    try:
+        if time.time() - cache_file.stat().st_mtime > RESPONSE_CACHE_TTL:
+            return None
+        return orjson.loads(cache_file.read_bytes())
+    except (OSError, ValueError):
+        return None
+
+
+def _save_cached_response(kind: str, key: str, data: Any) -> None:
+    """Cache an API response on disk."""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _response_cache_file(kind, key).write_bytes(orjson.dumps(data))
+    except OSError as e:
+        logger.warning(f"Could not cache {kind} response: {e}")
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is skipped because its circuit breaker is open."""
+
+
+class RateLimitedError(CircuitOpenError):
+    """Raised when a call is skipped because the upstream keeps returning 429."""
+
+
+class CircuitBreaker:
+    """
+    Stop calling an upstream API after repeated failures.
+
+    closed: calls go through; consecutive failures are counted.
+    open: calls fail immediately with CircuitOpenError until reset_timeout
+          seconds have passed since the breaker tripped.
+    half_open: one probe call is let through; success closes the breaker,
+               failure opens it again.
+
+    Rate limiting is tracked separately: an occasional 429 is a burst and
+    is retried, but more than rate_limit_threshold 429s within
+    rate_limit_window seconds means the upstream is persistently limiting
+    us, and calls are skipped with RateLimitedError until the window clears.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60,
+        rate_limit_threshold: int = 3,
+        rate_limit_window: float = 60,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.rate_limit_threshold = rate_limit_threshold
+        self.rate_limit_window = rate_limit_window
+        self.failures = 0
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.recent_429s = deque()
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError if calls should currently be skipped."""
+        with self._lock:
+            now = time.monotonic()
+            while self.recent_429s and now - self.recent_429s[0] > self.rate_limit_window:
+                self.recent_429s.popleft()
+            if len(self.recent_429s) > self.rate_limit_threshold:
+                raise RateLimitedError(f"{self.name} is persistently rate limiting (rate_limited_persist)")
+
+            if self.state == "closed":
+                return
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                logger.info(f"Circuit for {self.name} half-open, sending probe")
+                self.state = "half_open"
+                return
+            raise CircuitOpenError(f"Circuit for {self.name} is open")
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != "closed":
+                logger.info(f"Circuit for {self.name} closed")
+            self.failures = 0
+            self.state = "closed"
+
+    def record_rate_limited(self) -> None:
+        with self._lock:
+            self.recent_429s.append(time.monotonic())
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.warning(f"Circuit for {self.name} opened after {self.failures} failures")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call func through the breaker, recording the outcome.
+
+        Every outcome is recorded, so a half-open probe always resolves.
+        429s and 5xx responses count as failures; other HTTP errors (400,
+        404, ...) mean the upstream answered, so a bad query can't trip
+        the breaker. Transport errors and anything else raised count as
+        failures.
+        """
+        self.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except httpx.HTTPStatusError as e:
+            status_code = e.response.status_code
+            if status_code == 429:
+                self.record_rate_limited()
+            if status_code == 429 or status_code >= 500:
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        except BaseException:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+
+# One breaker per upstream (and per Overpass endpoint, so fallback still works)
+OVERPASS_BREAKERS = {endpoint: CircuitBreaker(endpoint) for endpoint in OVERPASS_ENDPOINTS}
+POLICE_BREAKER = CircuitBreaker("police")
+
+
+def _jittered(delay: float) -> float:
+    """Pick a wait in [delay/2, delay] so concurrent workers don't retry in lockstep."""
+    return random.uniform(0.5 * delay, delay)
+
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date), if present."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
 
 def _retry_with_backoff(
     func: Callable[[], Any],
@@ -34,7 +247,10 @@ def _retry_with_backoff(
     retry_on_status: tuple = (429, 500, 502, 503, 504),
 ) -> Any:
     """
-    Retry a function with exponential backoff.
+    Retry a function with jittered exponential backoff.
+
+    Waits are drawn from [delay/2, delay] so parallel workers spread out.
+    On 429 the server's Retry-After header is honoured when present.
 
     Args:
         func: Callable function to retry
@@ -52,17 +268,26 @@ def _retry_with_backoff(
     for attempt in range(max_retries):
         try:
             return func()
+        except CircuitOpenError:
+            # Upstream is known to be down - don't wait around retrying
+            raise
         except httpx.HTTPStatusError as e:
             last_error = e
             status_code = e.response.status_code
             if status_code in retry_on_status and attempt < max_retries - 1:
                 # Rate limited or server error - wait longer
                 if status_code == 429:
-                    delay = min(delay * 2, max_delay)
-                    logger.warning(f"Rate limited (429). Waiting {delay}s before retry...")
+                    retry_after = _retry_after_seconds(e.response)
+                    if retry_after is not None:
+                        wait = min(retry_after, max_delay) + random.uniform(0, 1)
+                    else:
+                        delay = min(delay * 2, max_delay)
+                        wait = _jittered(delay)
+                    logger.warning(f"Rate limited (429). Waiting {wait:.1f}s before retry...")
                 else:
-                    logger.warning(f"Server error ({status_code}). Retrying in {delay}s...")
-                time.sleep(delay)
+                    wait = _jittered(delay)
+                    logger.warning(f"Server error ({status_code}). Retrying in {wait:.1f}s...")
+                time.sleep(wait)
                 delay = min(delay * 2, max_delay)
             else:
                 logger.error(f"HTTP error {status_code} after {attempt + 1} attempts")
@@ -70,8 +295,9 @@ def _retry_with_backoff(
         except httpx.TimeoutException as e:
             last_error = e
             if attempt < max_retries - 1:
-                logger.warning(f"Timeout on attempt {attempt + 1}. Retrying in {delay}s...")
-                time.sleep(delay)
+                wait = _jittered(delay)
+                logger.warning(f"Timeout on attempt {attempt + 1}. Retrying in {wait:.1f}s...")
+                time.sleep(wait)
                 delay = min(delay * 2, max_delay)
             else:
                 logger.error(f"Timeout after {max_retries} attempts")
@@ -79,8 +305,9 @@ def _retry_with_backoff(
         except httpx.ConnectError as e:
             last_error = e
             if attempt < max_retries - 1:
-                logger.warning(f"Connection error on attempt {attempt + 1}. Retrying in {delay}s...")
-                time.sleep(delay)
+                wait = _jittered(delay)
+                logger.warning(f"Connection error on attempt {attempt + 1}. Retrying in {wait:.1f}s...")
+                time.sleep(wait)
                 delay = min(delay * 2, max_delay)
             else:
                 logger.error(f"Connection failed after {max_retries} attempts: {e}")
@@ -88,8 +315,9 @@ def _retry_with_backoff(
         except Exception as e:
             last_error = e
             if attempt < max_retries - 1:
-                logger.warning(f"Attempt {attempt + 1} failed: {e}. Retrying in {delay}s...")
-                time.sleep(delay)
+                wait = _jittered(delay)
+                logger.warning(f"Attempt {attempt + 1} failed: {e}. Retrying in {wait:.1f}s...")
+                time.sleep(wait)
                 delay = min(delay * 2, max_delay)
             else:
                 logger.error(f"All {max_retries} attempts failed. Last error: {e}")
@@ -103,32 +331,98 @@ def _query_overpass(query: str, timeout: int = 45) -> dict:
     Query Overpass API with automatic endpoint fallback.
 
     Tries multiple Overpass endpoints if one fails.
+    Responses are cached on disk, keyed by the query text.
     """
-    last_error = None
+    cached = _load_cached_response("overpass", query)
+    if cached is not None:
+        logger.debug("Using cached Overpass response")
+        return cached
+
+    # Only report the circuit as open if every endpoint was skipped; a real
+    # HTTP/transport error from any endpoint should still be retried
+    first_error = None
+    open_error = None
 
     for endpoint in OVERPASS_ENDPOINTS:
         try:
             logger.debug(f"Trying Overpass endpoint: {endpoint}")
-            response = httpx.post(
-                endpoint,
-                data={"data": query},
-                timeout=timeout,
-            )
-            response.raise_for_status()
-            return response.json()
+
+            def _post():
+                response = _overpass_client.post(
+                    endpoint,
+                    data={"data": query},
+                    timeout=timeout,
+                )
+                response.raise_for_status()
+                return response
+
+            response = OVERPASS_BREAKERS[endpoint].call(_post)
+            data = orjson.loads(response.content)
+            if data.get("remark"):
+                # Overpass reports runtime errors and timeouts as a 200 with
+                # a remark and partial (often empty) elements - don't cache it
+                logger.warning(f"Overpass remark from {endpoint}: {data['remark']}")
+            else:
+                _save_cached_response("overpass", query, data)
+            return data
+        except CircuitOpenError as e:
+            open_error = open_error or e
+            logger.warning(f"Endpoint {endpoint} skipped: {e}")
+            continue
         except Exception as e:
-            last_error = e
+            first_error = first_error or e
             logger.warning(f"Endpoint {endpoint} failed: {e}")
             continue
 
-    raise last_error or Exception("All Overpass endpoints failed")
-
-
-def gather_amenities(lat: float, lng: float, radius_m: int = 1500) -> dict:
+    raise first_error or open_error or Exception("All Overpass endpoints failed")
+
+
+# Combined amenities + green space query: amenities (nodes, then ways)
+# followed by green spaces. Ways and relations are printed with
+# "tags center" rather than "body" so the response doesn't carry every
+# polygon's node list.
+_OSM_QUERY = string.Template("""
+[out:json][timeout:60];
+(
+  node["shop"="supermarket"](around:$a_r,$lat,$lng);
+  node["shop"="convenience"](around:$a_r,$lat,$lng);
+  node["amenity"="pharmacy"](around:$a_r,$lat,$lng);
+);
+out body;
+(
+  way["shop"="supermarket"](around:$a_r,$lat,$lng);
+  way["amenity"="pharmacy"](around:$a_r,$lat,$lng);
+);
+out tags center;
+(
+  way["leisure"="park"](around:$n_r,$lat,$lng);
+  relation["leisure"="park"](around:$n_r,$lat,$lng);
+  way["leisure"="nature_reserve"](around:$n_r,$lat,$lng);
+  relation["leisure"="nature_reserve"](around:$n_r,$lat,$lng);
+  way["landuse"="forest"](around:$n_r,$lat,$lng);
+  way["leisure"="garden"](around:$n_r,$lat,$lng);
+  way["natural"="wood"](around:$n_r,$lat,$lng);
+);
+out tags center;
+""")
+
+
+def _is_amenity(tags: dict) -> bool:
+    """Whether an OSM element belongs to the amenities half of the query."""
+    return tags.get("shop") in ("supermarket", "convenience") or tags.get("amenity") == "pharmacy"
+
+
+def gather_osm(
+    lat: float,
+    lng: float,
+    amenities_radius_m: int = 1500,
+    nature_radius_m: int = 2000,
+) -> dict:
     """
-    Gather amenity data for an area.
+    Gather amenity and nature data for an area with a single Overpass request.
 
-    Returns dict with supermarkets, pharmacies, etc.
+    Returns dict with "amenities" (supermarkets, pharmacies, etc.) and
+    "nature" (parks, nature reserves, etc.) keys.
     Handles API failures gracefully by returning empty lists.
     """
     amenities = {
@@ -138,220 +432,201 @@ def gather_amenities(lat: float, lng: float, radius_m: int = 1500) -> dict:
         "api_success": False,
         "error": None,
     }
+    nature = {
+        "parks": [],
+        "parks_count": 0,
+        "nature_reserves": [],
+        "countryside_access": False,
+        "api_success": False,
+        "error": None,
+    }
 
-    logger.info(f"Gathering amenities for ({lat}, {lng}) within {radius_m}m radius")
-
-    def _fetch_amenities():
-        # More comprehensive query - includes ways and relations, and shop=convenience
-        query = f"""
-        [out:json][timeout:45];
-        (
-          node["shop"="supermarket"](around:{radius_m},{lat},{lng});
-          way["shop"="supermarket"](around:{radius_m},{lat},{lng});
-          node["shop"="convenience"](around:{radius_m},{lat},{lng});
-          node["amenity"="pharmacy"](around:{radius_m},{lat},{lng});
-          way["amenity"="pharmacy"](around:{radius_m},{lat},{lng});
-        );
-        out center body;
-        """
-        return _query_overpass(query, timeout=45)
+    logger.info(
+        f"Gathering amenities ({amenities_radius_m}m) and nature data "
+        f"({nature_radius_m}m) for ({lat}, {lng})"
+    )
+
+    def _fetch_osm():
+        # Coordinates are quantized so nearby locations share a cache entry.
+        q_lat, q_lng = _quantize(lat, lng)
+        query = _OSM_QUERY.substitute(
+            a_r=amenities_radius_m,
+            n_r=nature_radius_m,
+            lat=f"{q_lat:.{CACHE_COORD_PRECISION}f}",
+            lng=f"{q_lng:.{CACHE_COORD_PRECISION}f}",
+        )
+        return _query_overpass(query, timeout=60)
 
     # Try Overpass API with retries
     try:
-        data = _retry_with_backoff(_fetch_amenities, max_retries=3, initial_delay=2.0)
-        seen_names = set()  # Deduplicate by name
+        data = _retry_with_backoff(_fetch_osm, max_retries=3, initial_delay=2.0)
 
+        amenity_elements = []
+        nature_elements = []
         for element in data.get("elements", []):
-            tags = element.get("tags", {})
-            name = tags.get("name", tags.get("brand", "Unknown"))
-
-            # Skip duplicates
-            if name != "Unknown" and name in seen_names:
-                continue
-            if name != "Unknown":
-                seen_names.add(name)
-
-            # Get coordinates (center for ways, direct for nodes)
-            center = element.get("center", {})
-            elem_lat = center.get("lat", element.get("lat"))
-            elem_lng = center.get("lon", element.get("lon"))
-
-            if elem_lat is None or elem_lng is None:
-                continue
-
-            item = {
-                "name": name,
-                "lat": elem_lat,
-                "lng": elem_lng,
-                "distance_m": _calculate_distance_m(lat, lng, elem_lat, elem_lng),
-            }
-
-            shop_type = tags.get("shop")
-            amenity_type = tags.get("amenity")
-
-            if shop_type == "supermarket":
-                amenities["supermarkets"].append(item)
-            elif shop_type == "convenience":
-                # Add convenience stores as secondary supermarkets
-                item["type"] = "convenience"
-                amenities["supermarkets"].append(item)
-            elif amenity_type == "pharmacy":
-                amenities["pharmacies"].append(item)
-
-        # Sort by distance
-        for key in ["supermarkets", "pharmacies", "restaurants"]:
-            amenities[key] = sorted(amenities[key], key=lambda x: x["distance_m"])
+            if _is_amenity(element.get("tags", {})):
+                amenity_elements.append(element)
+            else:
+                nature_elements.append(element)
 
-        amenities["api_success"] = True
-        logger.info(f"Found {len(amenities['supermarkets'])} supermarkets/convenience stores, {len(amenities['pharmacies'])} pharmacies")
+        _parse_amenities(amenity_elements, lat, lng, amenities)
+        _parse_nature(nature_elements, lat, lng, nature)
 
         # Log warning if no supermarkets found (edge case)
         if not amenities["supermarkets"]:
-            logger.warning(f"No supermarkets found within {radius_m}m - this may indicate sparse data for this area")
+            logger.warning(f"No supermarkets found within {amenities_radius_m}m - this may indicate sparse data for this area")
+
+        # Log info if no parks found (edge case - still valid result)
+        if not nature["parks"]:
+            logger.info(f"No named parks found within {nature_radius_m}m - area may have limited green spaces")
 
     except httpx.TimeoutException as e:
         error_msg = f"API timeout after retries: {e}"
         logger.error(error_msg)
-        amenities["error"] = error_msg
+        amenities["error"] = nature["error"] = error_msg
         print(f"      ⚠️  {error_msg}")
 
     except httpx.HTTPStatusError as e:
         error_msg = f"API error (HTTP {e.response.status_code}): {e}"
         logger.error(error_msg)
-        amenities["error"] = error_msg
+        amenities["error"] = nature["error"] = error_msg
         print(f"      ⚠️  {error_msg}")
 
     except Exception as e:
-        error_msg = f"Failed to gather amenities: {e}"
+        error_msg = f"Failed to gather OSM data: {e}"
         logger.error(error_msg, exc_info=True)
-        amenities["error"] = error_msg
+        amenities["error"] = nature["error"] = error_msg
         print(f"      ⚠️  {error_msg}")
 
-    return amenities
+    return {"amenities": amenities, "nature": nature}
 
 
-def gather_nature_data(lat: float, lng: float, radius_m: int = 2000) -> dict:
-    """
-    Gather nature/green space data for an area.
+def _element_coords(element: dict) -> tuple:
+    """(lat, lng) of an Overpass element: its center for ways/relations, else its own."""
+    center = element.get("center")
+    if center:
+        return center.get("lat"), center.get("lon")
+    return element.get("lat"), element.get("lon")
 
-    Returns dict with parks, nature reserves, etc.
-    Handles API failures gracefully by returning empty lists.
-    """
-    nature = {
-        "parks": [],
-        "parks_count": 0,
-        "nature_reserves": [],
-        "countryside_access": False,
-        "api_success": False,
-        "error": None,
-    }
-
-    logger.info(f"Gathering nature data for ({lat}, {lng}) within {radius_m}m radius")
-
-    def _fetch_nature():
-        # Comprehensive query for green spaces
-        query = f"""
-        [out:json][timeout:45];
-        (
-          way["leisure"="park"](around:{radius_m},{lat},{lng});
-          relation["leisure"="park"](around:{radius_m},{lat},{lng});
-          way["leisure"="nature_reserve"](around:{radius_m},{lat},{lng});
-          relation["leisure"="nature_reserve"](around:{radius_m},{lat},{lng});
-          way["landuse"="forest"](around:{radius_m},{lat},{lng});
-          way["leisure"="garden"](around:{radius_m},{lat},{lng});
-          way["natural"="wood"](around:{radius_m},{lat},{lng});
-        );
-        out center body;
-        """
-        return _query_overpass(query, timeout=45)
 
-    try:
-        data = _retry_with_backoff(_fetch_nature, max_retries=3, initial_delay=2.0)
+def _parse_amenities(elements: list, lat: float, lng: float, amenities: dict) -> None:
+    """Fill the amenities dict from Overpass elements."""
+    seen_names = set()  # Deduplicate by name
+    located = []
 
-        seen_names = set()
+    for element in elements:
+        tags = element.get("tags", {})
+        name = tags.get("name", tags.get("brand", "Unknown"))
 
-        for element in data.get("elements", []):
-            tags = element.get("tags", {})
-            name = tags.get("name")
-
-            # Skip unnamed or duplicate entries
-            if not name or name in seen_names:
+        # Skip duplicates (unnamed places can't be told apart, so keep them)
+        if name != "Unknown":
+            if name in seen_names:
                 continue
             seen_names.add(name)
 
-            # Get center coordinates
-            center = element.get("center", {})
-            elem_lat = center.get("lat", element.get("lat"))
-            elem_lng = center.get("lon", element.get("lon"))
+        # Get coordinates (center for ways, direct for nodes)
+        elem_lat, elem_lng = _element_coords(element)
 
-            if elem_lat is None or elem_lng is None:
-                continue
+        if elem_lat is None or elem_lng is None:
+            continue
 
-            item = {
-                "name": name,
-                "lat": elem_lat,
-                "lng": elem_lng,
-                "distance_m": _calculate_distance_m(lat, lng, elem_lat, elem_lng),
-                "type": tags.get("leisure") or tags.get("landuse") or tags.get("natural"),
-            }
+        item = {
+            "name": name,
+            "lat": elem_lat,
+            "lng": elem_lng,
+        }
+        located.append(item)
 
-            leisure = tags.get("leisure")
-            landuse = tags.get("landuse")
-            natural = tags.get("natural")
+        shop_type = tags.get("shop")
+        amenity_type = tags.get("amenity")
 
-            if leisure == "park" or leisure == "garden":
-                nature["parks"].append(item)
-            elif leisure == "nature_reserve" or landuse == "forest" or natural == "wood":
-                nature["nature_reserves"].append(item)
-                nature["countryside_access"] = True
+        if shop_type == "supermarket":
+            amenities["supermarkets"].append(item)
+        elif shop_type == "convenience":
+            # Add convenience stores as secondary supermarkets
+            item["type"] = "convenience"
+            amenities["supermarkets"].append(item)
+        elif amenity_type == "pharmacy":
+            amenities["pharmacies"].append(item)
 
-        # Sort by distance and limit
-        nature["parks"] = sorted(nature["parks"], key=lambda x: x["distance_m"])[:10]
-        nature["nature_reserves"] = sorted(nature["nature_reserves"], key=lambda x: x["distance_m"])[:5]
-        nature["parks_count"] = len(nature["parks"])
-        nature["api_success"] = True
+    _add_distances(lat, lng, located)
 
-        logger.info(f"Found {len(nature['parks'])} parks, {len(nature['nature_reserves'])} nature reserves")
+    # Sort by distance
+    for key in ["supermarkets", "pharmacies", "restaurants"]:
+        amenities[key].sort(key=itemgetter("distance_m"))
 
-        # Log info if no parks found (edge case - still valid result)
-        if not nature["parks"]:
-            logger.info(f"No named parks found within {radius_m}m - area may have limited green spaces")
+    amenities["api_success"] = True
+    logger.info(f"Found {len(amenities['supermarkets'])} supermarkets/convenience stores, {len(amenities['pharmacies'])} pharmacies")
 
-    except httpx.TimeoutException as e:
-        error_msg = f"API timeout after retries: {e}"
-        logger.error(error_msg)
-        nature["error"] = error_msg
-        print(f"      ⚠️  {error_msg}")
 
-    except httpx.HTTPStatusError as e:
-        error_msg = f"API error (HTTP {e.response.status_code}): {e}"
-        logger.error(error_msg)
-        nature["error"] = error_msg
-        print(f"      ⚠️  {error_msg}")
+def _parse_nature(elements: list, lat: float, lng: float, nature: dict) -> None:
+    """Fill the nature dict from Overpass elements."""
+    seen_names = set()
+    located = []
 
-    except Exception as e:
-        error_msg = f"Failed to gather nature data: {e}"
-        logger.error(error_msg, exc_info=True)
-        nature["error"] = error_msg
-        print(f"      ⚠️  {error_msg}")
+    for element in elements:
+        tags = element.get("tags", {})
+        name = tags.get("name")
+
+        # Skip unnamed or duplicate entries
+        if not name or name in seen_names:
+            continue
+        seen_names.add(name)
+
+        # Get center coordinates
+        elem_lat, elem_lng = _element_coords(element)
+
+        if elem_lat is None or elem_lng is None:
+            continue
 
-    return nature
+        item = {
+            "name": name,
+            "lat": elem_lat,
+            "lng": elem_lng,
+            "type": tags.get("leisure") or tags.get("landuse") or tags.get("natural"),
+        }
+        located.append(item)
 
+        leisure = tags.get("leisure")
+        landuse = tags.get("landuse")
+        natural = tags.get("natural")
 
-def _calculate_distance_m(lat1: float, lng1: float, lat2: float, lng2: float) -> int:
-    """Calculate distance in meters between two points."""
-    from math import radians, sin, cos, sqrt, atan2
+        if leisure == "park" or leisure == "garden":
+            nature["parks"].append(item)
+        elif leisure == "nature_reserve" or landuse == "forest" or natural == "wood":
+            nature["nature_reserves"].append(item)
+            nature["countryside_access"] = True
 
-    R = 6371000  # Earth's radius in meters
+    _add_distances(lat, lng, located)
 
-    lat1, lng1, lat2, lng2 = map(radians, [lat1, lng1, lat2, lng2])
-    dlat = lat2 - lat1
-    dlng = lng2 - lng1
+    # Keep only the closest few - nsmallest avoids sorting hundreds of
+    # forest polygons just to throw most of them away
+    by_distance = itemgetter("distance_m")
+    nature["parks"] = heapq.nsmallest(10, nature["parks"], key=by_distance)
+    nature["nature_reserves"] = heapq.nsmallest(5, nature["nature_reserves"], key=by_distance)
+    nature["parks_count"] = len(nature["parks"])
+    nature["api_success"] = True
 
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlng/2)**2
-    c = 2 * atan2(sqrt(a), sqrt(1-a))
+    logger.info(f"Found {len(nature['parks'])} parks, {len(nature['nature_reserves'])} nature reserves")
 
-    return int(R * c)
+
+def _add_distances(lat: float, lng: float, items: list) -> None:
+    """
+    Set distance_m (from the origin) on every item in one pass.
+
+    The origin's radians and cosine are computed once rather than per item.
+    """
+    lat1 = radians(lat)
+    lng1 = radians(lng)
+    cos_lat1 = cos(lat1)
+
+    for item in items:
+        lat2 = radians(item["lat"])
+        dlat = lat2 - lat1
+        dlng = radians(item["lng"]) - lng1
+
+        a = sin(dlat/2)**2 + cos_lat1 * cos(lat2) * sin(dlng/2)**2
+        item["distance_m"] = int(EARTH_RADIUS_M * 2 * atan2(sqrt(a), sqrt(1-a)))
 
 
 # UK Police Data API
@@ -394,15 +669,28 @@ def gather_crime_data(lat: float, lng: float) -> dict:
     }
 
     def _fetch_crimes():
+        q_lat, q_lng = _quantize(lat, lng)
+        cache_key = f"{q_lat},{q_lng}"
+        cached = _load_cached_response("police", cache_key)
+        if cached is not None:
+            logger.debug("Using cached Police API response")
+            return cached
+
         # Get crimes for all categories at this location
         # The API returns data for a 1-mile radius by default
-        response = httpx.get(
-            f"{POLICE_API_BASE}/crimes-street/all-crime",
-            params={"lat": lat, "lng": lng},
-            timeout=30,
-        )
-        response.raise_for_status()
-        return response.json()
+        def _get():
+            response = _police_client.get(
+                f"{POLICE_API_BASE}/crimes-street/all-crime",
+                params={"lat": q_lat, "lng": q_lng},
+                timeout=30,
+            )
+            response.raise_for_status()
+            return response
+
+        response = POLICE_BREAKER.call(_get)
+        data = orjson.loads(response.content)
+        _save_cached_response("police", cache_key, data)
+        return data
 
     try:
         crimes = _retry_with_backoff(_fetch_crimes, max_retries=3, initial_delay=2.0)
@@ -2,11 +2,81 @@
 Geographic utilities - postcode lookup, distance calculations.
 """
 
+import atexit
+from functools import lru_cache
+from math import radians, cos
+from pathlib import Path
 from typing import Optional
 
-import httpx
+import orjson
+
+from .stations import get_station_db, haversine_distance
+from .yamlio import atomic_write
+
+CACHE_DIR = Path(__file__).parent.parent / "data" / "cache"
+GEOCODE_CACHE_FILE = CACHE_DIR / "geocode.json"
+
+# Flush the geocode cache to disk after this many new entries
+GEOCODE_SAVE_EVERY = 25
 
-from .stations import StationDatabase, haversine_distance
+# Postcode <-> coordinate lookups are effectively static, so they are kept
+# on disk without expiry. Loaded on first use.
+_geocode_cache = None
+_geocode_unsaved = 0
+
+
+def _get_geocode_cache() -> dict:
+    """Load the geocode cache from disk (once)."""
+    global _geocode_cache
+    if _geocode_cache is None:
+        try:
+            _geocode_cache = orjson.loads(GEOCODE_CACHE_FILE.read_bytes())
+        except (OSError, ValueError):
+            _geocode_cache = {}
+        _geocode_cache.setdefault("postcodes", {})
+        _geocode_cache.setdefault("reverse", {})
+    return _geocode_cache
+
+
+def _save_geocode_cache() -> None:
+    """Save the geocode cache to disk."""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        atomic_write(GEOCODE_CACHE_FILE, orjson.dumps(_get_geocode_cache(), option=orjson.OPT_INDENT_2))
+    except OSError as e:
+        print(f"Could not save geocode cache: {e}")
+
+
+def save_geocode_cache() -> None:
+    """Write any pending geocode cache entries to disk."""
+    global _geocode_unsaved
+    if _geocode_unsaved:
+        _save_geocode_cache()
+        _geocode_unsaved = 0
+
+
+def _geocode_cached() -> None:
+    """
+    Note a new geocode cache entry.
+    
+    Writes are batched: the file is rewritten every GEOCODE_SAVE_EVERY
+    entries rather than on every lookup, and pending entries are flushed
+    at exit (or by save_geocode_cache()).
+    """
+    global _geocode_unsaved
+    _geocode_unsaved += 1
+    if _geocode_unsaved >= GEOCODE_SAVE_EVERY:
+        save_geocode_cache()
+
+
+atexit.register(save_geocode_cache)
+
+
+@lru_cache(maxsize=1)
+def _postcodes_client():
+    """Shared keep-alive pool for postcodes.io, created on first lookup."""
+    from .enrichers import make_http_client
+    return make_http_client(timeout=10)
 
 
 def postcode_to_coords(postcode: str) -> Optional[dict]:
@@ -18,19 +88,26 @@ def postcode_to_coords(postcode: str) -> Optional[dict]:
         # Clean postcode
         postcode = postcode.strip().upper().replace(" ", "")
         
+        cache = _get_geocode_cache()["postcodes"]
+        if postcode in cache:
+            return dict(cache[postcode])
+        
         url = f"https://api.postcodes.io/postcodes/{postcode}"
-        response = httpx.get(url, timeout=10)
+        response = _postcodes_client().get(url)
         response.raise_for_status()
         
         data = response.json()
         if data.get("status") == 200:
             result = data["result"]
-            return {
+            coords = {
                 "lat": result["latitude"],
                 "lng": result["longitude"],
                 "town": result.get("admin_ward") or result.get("parish"),
                 "district": result.get("admin_district"),
             }
+            cache[postcode] = coords
+            _geocode_cached()
+            return dict(coords)
         
         return None
         
@@ -44,7 +121,7 @@ def find_nearest_station(lat: float, lng: float) -> Optional[dict]:
     Find the nearest train station to coordinates.
     Returns station info with walking time estimate.
     """
-    db = StationDatabase()
+    db = get_station_db()
     station = db.find_nearest(lat, lng)
     
     if station:
@@ -78,24 +155,28 @@ def coords_to_postcode(lat: float, lng: float) -> Optional[str]:
     Reverse geocode coordinates to nearest postcode.
     """
     try:
+        # 4 decimal places is ~11m, finer than postcode granularity
+        key = f"{lat:.4f},{lng:.4f}"
+        cache = _get_geocode_cache()["reverse"]
+        if key in cache:
+            return cache[key]
+        
         url = "https://api.postcodes.io/postcodes"
-        response = httpx.get(
+        response = _postcodes_client().get(
             url,
             params={"lon": lng, "lat": lat, "limit": 1},
-            timeout=10,
         )
         response.raise_for_status()
         
         data = response.json()
         if data.get("result"):
-            return data["result"][0]["postcode"]
+            postcode = data["result"][0]["postcode"]
+            cache[key] = postcode
+            _geocode_cached()
+            return postcode
         
         return None
         
     except Exception as e:
         print(f"Reverse geocode error: {e}")
         return None
-
-
-# Import math functions needed
-from math import radians, cos
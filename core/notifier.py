@@ -5,9 +5,13 @@ Integrates with OpenClaw's message tool.
 
 import json
 import os
-import subprocess
+import shutil
+from functools import lru_cache
 from typing import Optional
 
+# Checked once so sends don't fork a process just to find the CLI is missing
+_HAS_OPENCLAW = shutil.which("openclaw") is not None
+
 
 def send_telegram_update(message: str, group_id: Optional[str] = None) -> bool:
     """
@@ -15,7 +19,12 @@ def send_telegram_update(message: str, group_id: Optional[str] = None) -> bool:
     
     If running outside OpenClaw, falls back to direct API call.
     """
+    if not _HAS_OPENCLAW:
+        return _send_telegram_direct(message, group_id)
+    
     # Try OpenClaw CLI first
+    import subprocess
+    
     try:
         result = subprocess.run(
             [
@@ -43,10 +52,15 @@ def send_telegram_update(message: str, group_id: Optional[str] = None) -> bool:
     return _send_telegram_direct(message, group_id)
 
 
+@lru_cache(maxsize=1)
+def _telegram_client():
+    """Reused across messages so each send skips the TLS handshake."""
+    from .enrichers import make_http_client
+    return make_http_client(timeout=30)
+
+
 def _send_telegram_direct(message: str, chat_id: Optional[str] = None) -> bool:
     """Send directly via Telegram Bot API."""
-    import httpx
-    
     bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
     chat_id = chat_id or os.getenv("TELEGRAM_GROUP_ID")
     
@@ -56,14 +70,13 @@ def _send_telegram_direct(message: str, chat_id: Optional[str] = None) -> bool:
     
     try:
         url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-        response = httpx.post(
+        response = _telegram_client().post(
             url,
             json={
                 "chat_id": chat_id,
                 "text": message,
                 "parse_mode": "Markdown",
             },
-            timeout=30,
         )
         response.raise_for_status()
         return True
@@ -2,17 +2,25 @@
 Area scoring based on criteria weights.
 """
 
+from functools import lru_cache
 from pathlib import Path
 
-import yaml
-
 CONFIG_DIR = Path(__file__).parent.parent / "config"
 
 
+@lru_cache(maxsize=4)
+def _load_criteria_cached(path: str, mtime: float) -> dict:
+    """Parse criteria.yaml; keyed on mtime so edits are picked up."""
+    # Imported here so `import core.scorer` doesn't pay for yaml
+    from .yamlio import load_yaml
+    
+    return load_yaml(path)
+
+
 def load_criteria() -> dict:
-    """Load scoring criteria."""
-    with open(CONFIG_DIR / "criteria.yaml") as f:
-        return yaml.safe_load(f)
+    """Load scoring criteria (parsed once per file version)."""
+    path = CONFIG_DIR / "criteria.yaml"
+    return _load_criteria_cached(str(path), path.stat().st_mtime)
 
 
 def score_area(area: dict, amenities: dict, nature: dict, crime: dict = None) -> int:
@@ -23,37 +31,42 @@ def score_area(area: dict, amenities: dict, nature: dict, crime: dict = None) ->
 
     Args:
         area: Area info dict with commute_minutes, etc.
-        amenities: Amenities data from gather_amenities()
-        nature: Nature data from gather_nature_data()
+        amenities: Amenities data from gather_osm()["amenities"]
+        nature: Nature data from gather_osm()["nature"]
         crime: Crime data from gather_crime_data() (optional)
     """
     criteria = load_criteria()
     weights = criteria.get("scoring", {})
+    commute_config = criteria["commute"]
     crime = crime or {}
     
-    scores = {}
+    # Each sub-score (0-100) is added to the weighted total as soon as
+    # it is known
+    weight = weights.get
+    total = 0
     
     # Commute score (35 points default)
     # Perfect score if commute <= 30 min, decreasing to 0 at max_minutes
-    max_minutes = criteria["commute"]["max_minutes"]
+    max_minutes = commute_config["max_minutes"]
     commute = area.get("commute_minutes", max_minutes)
 
     if commute <= 30:
-        scores["commute"] = 100
+        commute_score = 100
     elif commute >= max_minutes:
-        scores["commute"] = 0
+        commute_score = 0
     else:
         # Linear scale from 30 to max
-        scores["commute"] = 100 - ((commute - 30) / (max_minutes - 30)) * 100
+        commute_score = 100 - ((commute - 30) / (max_minutes - 30)) * 100
 
     # Apply train change penalty if applicable
     # Ideal: direct mainline train to London (0 changes)
     # Tube/bus within London after mainline is expected and doesn't count
     mainline_changes = area.get("mainline_changes", 0)
     if mainline_changes > 0:
-        train_change_config = criteria["commute"].get("train_change_penalty", {})
+        train_change_config = commute_config.get("train_change_penalty", {})
         penalty_per_change = train_change_config.get("penalty_per_change", 15)
-        scores["commute"] = max(0, scores["commute"] - (mainline_changes * penalty_per_change))
+        commute_score = max(0, commute_score - (mainline_changes * penalty_per_change))
+    total += (commute_score / 100) * weight("commute", 0)
     
     # Nature score (20 points default)
     # Based on number of parks and countryside access
@@ -63,27 +76,30 @@ def score_area(area: dict, amenities: dict, nature: dict, crime: dict = None) ->
     nature_score = min(100, parks_count * 15)  # Each park worth 15 points, max 100
     if has_countryside:
         nature_score = min(100, nature_score + 30)  # Bonus for countryside
-    scores["nature"] = nature_score
+    total += (nature_score / 100) * weight("nature", 0)
     
     # Amenities score (10 points default)
     # Based on supermarket access
     supermarkets = len(amenities.get("supermarkets", []))
     
     if supermarkets >= 3:
-        scores["amenities"] = 100
+        amenities_score = 100
     elif supermarkets >= 1:
-        scores["amenities"] = 60 + (supermarkets - 1) * 20
+        amenities_score = 60 + (supermarkets - 1) * 20
     else:
-        scores["amenities"] = 20  # Minimum for being a real place
+        amenities_score = 20  # Minimum for being a real place
+    total += (amenities_score / 100) * weight("amenities", 0)
     
     # Price score (25 points default)
     # This will be calculated in Phase 2 with actual listings
     # For now, assume average based on area type
-    scores["price"] = 70  # Placeholder
+    price_score = 70  # Placeholder
+    total += (price_score / 100) * weight("price", 0)
     
     # General vibe score (5 points default)
     # Placeholder - will use AI analysis later
-    scores["general_vibe"] = 70  # Placeholder
+    general_vibe_score = 70  # Placeholder
+    total += (general_vibe_score / 100) * weight("general_vibe", 0)
 
     # Safety score (15 points default)
     # Based on crime statistics from UK Police API
@@ -99,27 +115,22 @@ def score_area(area: dict, amenities: dict, nature: dict, crime: dict = None) ->
         weighted_crimes = total_crimes + serious_crimes  # Serious counted twice
 
         if weighted_crimes <= excellent_threshold:
-            scores["safety"] = 100
+            safety_score = 100
         elif weighted_crimes <= good_threshold:
             # Scale from 100 to 80
-            scores["safety"] = 100 - ((weighted_crimes - excellent_threshold) /
+            safety_score = 100 - ((weighted_crimes - excellent_threshold) /
                                        (good_threshold - excellent_threshold)) * 20
         elif weighted_crimes <= acceptable_threshold:
             # Scale from 80 to 50
-            scores["safety"] = 80 - ((weighted_crimes - good_threshold) /
+            safety_score = 80 - ((weighted_crimes - good_threshold) /
                                       (acceptable_threshold - good_threshold)) * 30
         else:
             # Scale from 50 down to 0 (cap at 2x acceptable)
             over_threshold = weighted_crimes - acceptable_threshold
-            scores["safety"] = max(0, 50 - (over_threshold / acceptable_threshold) * 50)
+            safety_score = max(0, 50 - (over_threshold / acceptable_threshold) * 50)
     else:
         # No crime data available - neutral score
-        scores["safety"] = 70  # Default when data unavailable
-
-    # Calculate weighted total
-    total = 0
-    for key, weight in weights.items():
-        if key in scores:
-            total += (scores[key] / 100) * weight
+        safety_score = 70  # Default when data unavailable
+    total += (safety_score / 100) * weight("safety", 0)
     
     return round(total)
@@ -3,12 +3,13 @@ UK Train Station Database
 Provides station data for commute calculations.
 """
 
-import json
-from math import radians, sin, cos, sqrt, atan2
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from math import radians, sin, cos, sqrt, atan2, asin, pi
 from pathlib import Path
 from typing import Optional
 
-import httpx
+import orjson
 
 DATA_DIR = Path(__file__).parent.parent / "data"
 STATIONS_FILE = DATA_DIR / "stations.json"
@@ -17,14 +18,17 @@ STATIONS_FILE = DATA_DIR / "stations.json"
 LONDON_LAT = 51.5074
 LONDON_LNG = -0.1278
 
+EARTH_RADIUS_KM = 6371
+
 
 def haversine_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
     """Calculate distance between two points in km."""
-    R = 6371  # Earth's radius in km
+    R = EARTH_RADIUS_KM
     
-    lat1, lng1, lat2, lng2 = map(radians, [lat1, lng1, lat2, lng2])
+    lat1 = radians(lat1)
+    lat2 = radians(lat2)
     dlat = lat2 - lat1
-    dlng = lng2 - lng1
+    dlng = radians(lng2 - lng1)
     
     a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlng/2)**2
     c = 2 * atan2(sqrt(a), sqrt(1-a))
@@ -32,6 +36,32 @@ def haversine_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> fl
     return R * c
 
 
+@lru_cache(maxsize=1)
+def _overpass_client():
+    """
+    HTTP client for station refreshes, created on first use.
+    
+    Overpass station dumps are slow, so this gets its own long-timeout pool.
+    """
+    from .enrichers import make_http_client
+    return make_http_client(timeout=120)
+
+
+def _max_lng_gap(angle: float, cos_lat: float) -> float:
+    """
+    Largest longitude difference (radians) of any point within `angle`
+    (great-circle radians) of a point at the latitude with cosine cos_lat.
+    """
+    if angle >= pi / 2 or sin(angle) >= cos_lat:
+        return pi
+    return asin(sin(angle) / cos_lat)
+
+
+def _haversine_term_to_km(a: float) -> float:
+    """Convert the haversine 'a' term into a distance in km."""
+    return EARTH_RADIUS_KM * 2 * atan2(sqrt(a), sqrt(1-a))
+
+
 class StationDatabase:
     """
     Database of UK train stations.
@@ -40,19 +70,31 @@ class StationDatabase:
     
     def __init__(self):
         self.stations = self._load_stations()
+        self._index_stations()
+    
+    def _index_stations(self) -> None:
+        """
+        Build a latitude-sorted index of station coordinates in radians.
+        
+        Great-circle distance is never less than the latitude difference,
+        so a query only has to look at the band of stations around its own
+        latitude instead of scanning the whole country.
+        """
+        self._order = sorted(range(len(self.stations)), key=lambda i: self.stations[i]["lat"])
+        self._lat_r = [radians(self.stations[i]["lat"]) for i in self._order]
+        self._lng_r = [radians(self.stations[i]["lng"]) for i in self._order]
+        self._cos_lat = [cos(lat_r) for lat_r in self._lat_r]
     
     def _load_stations(self) -> list:
         """Load stations from cache or fetch fresh."""
         if STATIONS_FILE.exists():
-            with open(STATIONS_FILE) as f:
-                return json.load(f)
+            return orjson.loads(STATIONS_FILE.read_bytes())
         return []
     
     def _save_stations(self, stations: list) -> None:
         """Save stations to cache."""
         DATA_DIR.mkdir(parents=True, exist_ok=True)
-        with open(STATIONS_FILE, "w") as f:
-            json.dump(stations, f, indent=2)
+        STATIONS_FILE.write_bytes(orjson.dumps(stations, option=orjson.OPT_INDENT_2))
     
     def refresh(self) -> None:
         """
@@ -73,7 +115,7 @@ class StationDatabase:
         """
         
         try:
-            response = httpx.post(overpass_url, data={"data": query}, timeout=120)
+            response = _overpass_client().post(overpass_url, data={"data": query})
             response.raise_for_status()
             data = response.json()
             
@@ -91,6 +133,7 @@ class StationDatabase:
                     })
             
             self.stations = stations
+            self._index_stations()
             self._save_stations(stations)
             print(f"Saved {len(stations)} stations")
             
@@ -114,6 +157,7 @@ class StationDatabase:
             {"name": "Cambridge", "lat": 52.1943, "lng": 0.1376, "town": "Cambridge"},
             {"name": "Peterborough", "lat": 52.5750, "lng": -0.2486, "town": "Peterborough"},
         ]
+        self._index_stations()
         self._save_stations(self.stations)
     
     def get_stations_near_london(self, radius_km: float = 150) -> list:
@@ -121,29 +165,85 @@ class StationDatabase:
         if not self.stations:
             self.refresh()
         
+        lat1 = radians(LONDON_LAT)
+        lng1 = radians(LONDON_LNG)
+        cos_lat1 = cos(lat1)
+        lats, lngs, cos_lats = self._lat_r, self._lng_r, self._cos_lat
+        
+        # Only stations inside the latitude band can be within the radius
+        band = radius_km / EARTH_RADIUS_KM
+        max_term = sin(band / 2) ** 2
+        lo = bisect_left(lats, lat1 - band)
+        hi = bisect_right(lats, lat1 + band)
+        
+        # ...and inside the longitude window the radius can span at this latitude
+        lng_window = _max_lng_gap(band, cos_lat1)
+        
         nearby = []
-        for station in self.stations:
-            distance = haversine_distance(
-                LONDON_LAT, LONDON_LNG,
-                station["lat"], station["lng"]
-            )
-            if distance <= radius_km:
-                nearby.append({**station, "distance_km": round(distance, 1)})
+        for k in range(lo, hi):
+            dlng = lngs[k] - lng1
+            if abs(dlng) > lng_window:
+                continue
+            a = sin((lats[k] - lat1)/2)**2 + cos_lat1 * cos_lats[k] * sin(dlng/2)**2
+            if a <= max_term:
+                i = self._order[k]
+                nearby.append((round(_haversine_term_to_km(a), 1), i))
         
-        return sorted(nearby, key=lambda x: x["distance_km"])
+        # Ties keep the station file order
+        nearby.sort()
+        return [{**self.stations[i], "distance_km": distance} for distance, i in nearby]
     
     def find_nearest(self, lat: float, lng: float) -> Optional[dict]:
         """Find the nearest station to given coordinates."""
         if not self.stations:
             self.refresh()
         
-        nearest = None
-        min_distance = float("inf")
+        if not self.stations:
+            return None
         
-        for station in self.stations:
-            distance = haversine_distance(lat, lng, station["lat"], station["lng"])
-            if distance < min_distance:
-                min_distance = distance
-                nearest = {**station, "distance_km": round(distance, 1)}
+        lat1 = radians(lat)
+        lng1 = radians(lng)
+        cos_lat1 = cos(lat1)
+        lats, lngs, cos_lats = self._lat_r, self._lng_r, self._cos_lat
+        n = len(lats)
         
-        return nearest
+        # Walk outwards from the query latitude, nearest latitude first, and
+        # stop once the latitude gap alone exceeds the best match so far.
+        # Stations whose longitude gap can't beat the best match are skipped
+        # with a plain comparison, before any trig.
+        hi = bisect_left(lats, lat1)
+        lo = hi - 1
+        best_a, best_k = None, None
+        best_angle = lng_window = float("inf")
+        while lo >= 0 or hi < n:
+            if hi < n and (lo < 0 or lats[hi] - lat1 <= lat1 - lats[lo]):
+                k = hi
+                hi += 1
+            else:
+                k = lo
+                lo -= 1
+            
+            dlat = lats[k] - lat1
+            if abs(dlat) > best_angle:
+                break
+            
+            dlng = lngs[k] - lng1
+            if abs(dlng) > lng_window:
+                continue
+            
+            a = sin(dlat/2)**2 + cos_lat1 * cos_lats[k] * sin(dlng/2)**2
+            if best_a is None or a < best_a:
+                best_a, best_k = a, k
+                best_angle = 2 * asin(sqrt(best_a))
+                lng_window = _max_lng_gap(best_angle, cos_lat1)
+        
+        return {
+            **self.stations[self._order[best_k]],
+            "distance_km": round(_haversine_term_to_km(best_a), 1),
+        }
+
+
+@lru_cache(maxsize=1)
+def get_station_db() -> StationDatabase:
+    """Shared StationDatabase, loaded and indexed once per process."""
+    return StationDatabase()
@@ -0,0 +1,89 @@
+"""
+YAML config file I/O.
+
+Loading: a parsed copy of each file is pickled to data/cache, keyed on the
+file's mtime and size, so repeated CLI runs skip the YAML parse until the
+file changes.
+
+Saving: files are written to a temp file and renamed into place, so a run
+killed mid-write can't leave a truncated config behind.
+"""
+
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+# libyaml's C loader/dumper when available, same safe semantics
+try:
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
+
+CACHE_DIR = Path(__file__).parent.parent / "data" / "cache"
+
+
+def _cache_file(path: Path) -> Path:
+    """Path of the pickled copy of a YAML file."""
+    return CACHE_DIR / f"yaml_{path.stem}.pkl"
+
+
+def load_yaml(path: Path) -> Any:
+    """
+    Load a YAML file, reusing the pickled copy while the file is unchanged.
+
+    Returns a fresh object on every call, so callers may modify it.
+    """
+    path = Path(path)
+    stat = path.stat()
+    key = (stat.st_mtime_ns, stat.st_size)
+    cache_file = _cache_file(path)
+
+    try:
+        with open(cache_file, "rb") as f:
+            cached_key, data = pickle.load(f)
+        if cached_key == key:
+            return data
+    except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError):
+        pass
+
+    # Parse from one in-memory buffer rather than a stream of small reads
+    data = yaml.load(path.read_bytes(), Loader=_Loader)
+
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Several processes (e.g. web workers) may share the snapshot
+        atomic_write(cache_file, pickle.dumps((key, data), protocol=pickle.HIGHEST_PROTOCOL))
+    except OSError:
+        pass
+
+    return data
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """Replace a file's contents so readers see either the old or new file."""
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def save_yaml(path: Path, data: Any, **kwargs) -> None:
+    """
+    Atomically write data as block-style YAML, keeping key order.
+
+    Extra keyword arguments are passed to yaml.dump.
+    """
+    options = {"default_flow_style": False, "sort_keys": False, **kwargs}
+    text = yaml.dump(data, Dumper=_Dumper, **options)
+    atomic_write(path, text.encode("utf-8"))
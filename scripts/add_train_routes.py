@@ -4,15 +4,20 @@ Add train route information to areas.yaml
 Identifies mainline changes based on UK railway geography.
 """
 
-import yaml
+import sys
 from pathlib import Path
 
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.yamlio import load_yaml, save_yaml
+
 CONFIG_DIR = Path(__file__).parent.parent / "config"
 AREAS_FILE = CONFIG_DIR / "areas.yaml"
 
 # Stations that have DIRECT services to King's Cross or St Pancras
 # (mainline_changes = 0)
-DIRECT_STATIONS = {
+DIRECT_STATIONS = frozenset({
     # Thameslink core stations
     "st albans city", "elstree & borehamwood", "radlett", "harpenden",
     "luton airport parkway", "luton", "leagrave", "bedford",
@@ -88,14 +93,12 @@ DIRECT_STATIONS = {
 
     # Ashwell & Morden
     "ashwell & morden",
-}
+})
 
 # Stations requiring 1 mainline change (e.g., change at Bedford)
 # These are typically beyond Bedford on the Midland Mainline
-STATIONS_ONE_CHANGE = {
-    # Beyond Bedford on Midland Main Line - need change at Bedford
-    # (Note: Currently none in this list - Bedford itself is direct Thameslink)
-}
+# (Note: Currently none in this list - Bedford itself is direct Thameslink)
+STATIONS_ONE_CHANGE = frozenset()
 
 def get_route_info(station_name: str) -> tuple:
     """
@@ -122,8 +125,7 @@ def get_route_info(station_name: str) -> tuple:
 def main():
     """Add route information to all areas."""
     # Load areas
-    with open(AREAS_FILE) as f:
-        data = yaml.safe_load(f)
+    data = load_yaml(AREAS_FILE)
 
     areas = data.get("areas", [])
     updated_count = 0
@@ -138,8 +140,7 @@ def main():
         updated_count += 1
 
     # Save updated areas
-    with open(AREAS_FILE, "w") as f:
-        yaml.dump(data, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+    save_yaml(AREAS_FILE, data, allow_unicode=True)
 
     print(f"Updated {updated_count} areas with train route information")
 
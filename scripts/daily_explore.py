@@ -7,22 +7,28 @@ Usage:
     python scripts/daily_explore.py
     python scripts/daily_explore.py --area "St Albans"  # Explore specific area
     python scripts/daily_explore.py --dry-run           # Don't save or notify
+    python scripts/daily_explore.py --checkpoint        # Save partial results after each step
+    python scripts/daily_explore.py --batch 10          # Explore the next 10 pending areas
 
 Features:
 - Robust API calls with retries and exponential backoff
+- Amenity and nature data fetched in one Overpass request, concurrently with crime data
 - Partial result saving if script fails mid-way
+- Optional batch mode exploring several pending areas concurrently
 - Comprehensive logging with timestamps to file and console
 - Graceful handling of edge cases (no parks, API timeout, etc.)
 """
 
 import argparse
-import json
+import os
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
-import yaml
+import orjson
 
 # Paths (defined early for logging setup)
 BASE_DIR = Path(__file__).parent.parent
@@ -74,53 +80,84 @@ logger = setup_logging()
 # Add parent to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from core.enrichers import gather_amenities, gather_nature_data, gather_crime_data
+from core.enrichers import gather_osm, gather_crime_data
 from core.scorer import score_area
-from core.notifier import send_telegram_update
+from core.notifier import send_telegram_update, send_daily_summary
+from core.yamlio import atomic_write, load_yaml, save_yaml
 
 # Paths (BASE_DIR already defined above for logging)
 CONFIG_DIR = BASE_DIR / "config"
 CACHE_DIR = BASE_DIR / "data" / "cache"
 
+# Area cache files are machine-read, so they are written compact unless
+# DEBUG_CACHE_PRETTY is set
+CACHE_JSON_OPTIONS = orjson.OPT_INDENT_2 if os.getenv("DEBUG_CACHE_PRETTY") else 0
+
+# Areas explored at once with --batch. Each exploration already runs two
+# requests in parallel, and Overpass only allows a few slots per client.
+BATCH_WORKERS = 4
+
 
 def load_areas() -> dict:
     """Load areas configuration."""
-    with open(CONFIG_DIR / "areas.yaml") as f:
-        return yaml.safe_load(f) or {"areas": []}
+    return load_yaml(CONFIG_DIR / "areas.yaml") or {"areas": []}
 
 
 def save_areas(data: dict) -> None:
     """Save areas configuration."""
-    with open(CONFIG_DIR / "areas.yaml", "w") as f:
-        yaml.dump(data, f, default_flow_style=False, sort_keys=False)
+    save_yaml(CONFIG_DIR / "areas.yaml", data)
+
+
+@lru_cache(maxsize=512)
+def area_cache_file(area_name: str) -> Path:
+    """Cache file path for an area (worked out once per name)."""
+    return CACHE_DIR / f"area_{area_name.lower().replace(' ', '_')}.json"
 
 
 def save_area_cache(area_name: str, data: dict) -> None:
     """Save cached data for an area."""
-    cache_file = CACHE_DIR / f"area_{area_name.lower().replace(' ', '_')}.json"
-    with open(cache_file, "w") as f:
-        json.dump(data, f, indent=2)
+    cache_file = area_cache_file(area_name)
+    atomic_write(cache_file, orjson.dumps(data, option=CACHE_JSON_OPTIONS))
 
 
-def get_next_area(areas_data: dict) -> dict | None:
-    """Get next pending area to explore."""
-    areas = areas_data.get("areas", [])
+def get_next_areas(areas_data: dict, count: int) -> list:
+    """Get up to `count` pending areas to explore, priority areas first."""
+    pending = [a for a in areas_data.get("areas", []) if a["status"] == "pending"]
+    
+    # First pending area for each name, built in one pass
+    pending_by_name = {}
+    for a in pending:
+        pending_by_name.setdefault(a["name"], a)
     
-    # Check priority areas first
+    # Priority areas first, then pending areas in file order
+    selected = {}
     for name in areas_data.get("priority_areas", []):
-        area = next((a for a in areas if a["name"] == name and a["status"] == "pending"), None)
+        area = pending_by_name.get(name)
         if area:
-            return area
+            selected.setdefault(id(area), area)
+    for area in pending:
+        selected.setdefault(id(area), area)
+        if len(selected) >= count:
+            break
     
-    # Then first pending
-    return next((a for a in areas if a["status"] == "pending"), None)
+    return list(selected.values())[:count]
+
 
+def get_next_area(areas_data: dict) -> dict | None:
+    """Get next pending area to explore."""
+    areas = get_next_areas(areas_data, 1)
+    return areas[0] if areas else None
 
-def explore_area(area: dict, dry_run: bool = False) -> dict:
+
+def explore_area(area: dict, dry_run: bool = False, checkpoint: bool = False) -> tuple:
     """
     Explore an area and gather all relevant data.
 
-    Returns enriched area data with score.
+    Returns (enriched area data with score, cache data).
+
+    The cache file is written once at the end, or with the error if
+    exploration fails. With checkpoint=True it is also written after each
+    data source, so a killed run still leaves partial results on disk.
 
     Handles edge cases:
     - API failures: Continues with partial data, score may be lower
@@ -128,14 +165,15 @@ def explore_area(area: dict, dry_run: bool = False) -> dict:
     - No supermarkets: Valid result, area scores lower on amenities
     """
     logger.info(f"Starting exploration for: {area['name']}")
-    logger.debug(f"Area details: {json.dumps(area, indent=2)}")
+    logger.debug(f"Area details: {orjson.dumps(area, option=orjson.OPT_INDENT_2).decode()}")
     print(f"\n🔍 Exploring: {area['name']}")
     print(f"   Station: {area['station']}")
     print(f"   Commute: {area['commute_minutes']} min to King's Cross")
     print(f"   Coordinates: ({area['lat']}, {area['lng']})")
 
+    explored_at = datetime.now()
     cache_data = {
-        "explored_at": datetime.now().isoformat(),
+        "explored_at": explored_at.isoformat(),
         "station": area["station"],
         "commute_minutes": area["commute_minutes"],
         "lat": area["lat"],
@@ -145,15 +183,22 @@ def explore_area(area: dict, dry_run: bool = False) -> dict:
     }
 
     # Save initial partial cache
-    if not dry_run:
+    if checkpoint and not dry_run:
         save_area_cache(area["name"], cache_data)
         logger.info(f"Saved initial cache for {area['name']}")
 
+    # Amenities and nature share one Overpass request; crime hits a separate
+    # API. Start both up front and consume the results in order to keep the
+    # partial-save checkpoints.
+    pool = ThreadPoolExecutor(max_workers=2)
+    osm_future = pool.submit(gather_osm, area["lat"], area["lng"])
+    crime_future = pool.submit(gather_crime_data, area["lat"], area["lng"])
+
     try:
         # Gather amenities (supermarkets, pharmacies)
         print("   📍 Gathering amenities...")
         logger.info("Gathering amenities...")
-        amenities = gather_amenities(area["lat"], area["lng"])
+        amenities = osm_future.result()["amenities"]
         cache_data["amenities"] = amenities
 
         supermarket_count = len(amenities.get('supermarkets', []))
@@ -171,7 +216,7 @@ def explore_area(area: dict, dry_run: bool = False) -> dict:
             logger.warning(warning)
 
         # Save partial results after amenities
-        if not dry_run:
+        if checkpoint and not dry_run:
             cache_data["exploration_status"] = "amenities_complete"
             save_area_cache(area["name"], cache_data)
             logger.info(f"Saved amenities for {area['name']}")
@@ -179,7 +224,7 @@ def explore_area(area: dict, dry_run: bool = False) -> dict:
         # Gather nature data (parks, green spaces)
         print("   🌳 Gathering nature data...")
         logger.info("Gathering nature data...")
-        nature = gather_nature_data(area["lat"], area["lng"])
+        nature = osm_future.result()["nature"]
         cache_data["nature"] = nature
 
         parks_count = nature.get('parks_count', 0)
@@ -197,7 +242,7 @@ def explore_area(area: dict, dry_run: bool = False) -> dict:
             logger.warning(warning)
 
         # Save partial results after nature data
-        if not dry_run:
+        if checkpoint and not dry_run:
             cache_data["exploration_status"] = "nature_complete"
             save_area_cache(area["name"], cache_data)
             logger.info(f"Saved nature data for {area['name']}")
@@ -205,7 +250,7 @@ def explore_area(area: dict, dry_run: bool = False) -> dict:
         # Gather crime statistics from UK Police API
         print("   🚔 Gathering crime statistics...")
         logger.info("Gathering crime data...")
-        crime = gather_crime_data(area["lat"], area["lng"])
+        crime = crime_future.result()
         cache_data["crime"] = crime
 
         total_crimes = crime.get('total_crimes', 0)
@@ -221,7 +266,7 @@ def explore_area(area: dict, dry_run: bool = False) -> dict:
             logger.warning(warning)
 
         # Save partial results after crime data
-        if not dry_run:
+        if checkpoint and not dry_run:
             cache_data["exploration_status"] = "crime_complete"
             save_area_cache(area["name"], cache_data)
             logger.info(f"Saved crime data for {area['name']}")
@@ -231,6 +276,7 @@ def explore_area(area: dict, dry_run: bool = False) -> dict:
         logger.info("Calculating score...")
         score = score_area(area, amenities, nature, crime)
         cache_data["score"] = score
+        cache_data["display"] = display_summary(amenities, nature)
         cache_data["exploration_status"] = "complete"
         print(f"      Score: {score}/100")
         logger.info(f"Final score for {area['name']}: {score}/100")
@@ -249,12 +295,12 @@ def explore_area(area: dict, dry_run: bool = False) -> dict:
 
         logger.info(f"Successfully completed exploration for {area['name']} with score {score}")
 
-        return {
-            **area,
-            "status": "explored",
-            "explored_at": datetime.now().strftime("%Y-%m-%d"),
-            "score": score,
-        }
+        if not dry_run:
+            # Update the area entry in place; it is the one held in areas_data
+            area["status"] = "explored"
+            area["explored_at"] = explored_at.strftime("%Y-%m-%d")
+            area["score"] = score
+        return area, cache_data
 
     except Exception as e:
         logger.error(f"Exploration failed for {area['name']}: {e}", exc_info=True)
@@ -271,18 +317,46 @@ def explore_area(area: dict, dry_run: bool = False) -> dict:
         # Re-raise to let caller handle
         raise
 
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def display_summary(amenities: dict, nature: dict) -> dict:
+    """Summary fields shown in the Telegram update."""
+    parks_count = len(nature.get("parks", []))
+    return {
+        "supermarket_names": ", ".join(s["name"] for s in amenities.get("supermarkets", [])[:4]) or "None found",
+        "nature_score": min(10, parks_count * 2),
+        "parks_count": parks_count,
+    }
+
+
+def explore_areas(areas: list, dry_run: bool = False, checkpoint: bool = False,
+                  max_workers: int = BATCH_WORKERS) -> list:
+    """
+    Explore several areas concurrently.
+
+    Each exploration is network-bound, so threads are enough. Areas that
+    fail are logged by explore_area and left out of the results.
+
+    Returns list of (updated area, cache data) tuples.
+    """
+    def explore(area: dict):
+        try:
+            return explore_area(area, dry_run=dry_run, checkpoint=checkpoint)
+        except Exception:
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return [result for result in pool.map(explore, areas) if result is not None]
+
 
 def format_telegram_message(area: dict, cache: dict, progress: dict = None) -> str:
     """Format the daily Telegram update message."""
-    amenities = cache.get("amenities", {})
-    nature = cache.get("nature", {})
     crime = cache.get("crime", {})
-
-    supermarkets = amenities.get("supermarkets", [])
-    supermarket_names = ", ".join([s["name"] for s in supermarkets[:4]]) or "None found"
-
-    parks = nature.get("parks", [])
-    nature_score = min(10, len(parks) * 2) if parks else 0
+    display = cache.get("display") or display_summary(
+        cache.get("amenities", {}), cache.get("nature", {})
+    )
 
     # Safety rating based on crime data
     total_crimes = crime.get("total_crimes", 0)
@@ -304,9 +378,9 @@ def format_telegram_message(area: dict, cache: dict, progress: dict = None) -> s
 
 📍 **Area Explored:** {area['name']}
 🚂 **Commute to KX:** {area['commute_minutes']} min
-🌳 **Nature Score:** {nature_score}/10 ({len(parks)} parks nearby)
+🌳 **Nature Score:** {display['nature_score']}/10 ({display['parks_count']} parks nearby)
 🚔 **Crime Level:** {crime_info}
-🛒 **Supermarkets:** {supermarket_names}
+🛒 **Supermarkets:** {display['supermarket_names']}
 ⭐ **Overall Score:** {area['score']}/100
 
 """
@@ -333,6 +407,9 @@ def main():
     parser.add_argument("--area", type=str, help="Explore specific area by name")
     parser.add_argument("--dry-run", action="store_true", help="Don't save or notify")
     parser.add_argument("--no-notify", action="store_true", help="Skip Telegram notification")
+    parser.add_argument("--checkpoint", action="store_true", help="Save area cache after each data source")
+    parser.add_argument("--batch", type=int, default=1, help="Explore up to N pending areas in one run")
+    parser.add_argument("--batch-workers", type=int, default=BATCH_WORKERS, help="Areas explored concurrently with --batch")
     
     args = parser.parse_args()
     
@@ -346,7 +423,7 @@ def main():
         print("❌ No areas configured. Run find_commutable_areas.py first.")
         sys.exit(1)
     
-    # Get area to explore
+    # Get area(s) to explore
     if args.area:
         area = next(
             (a for a in areas_data["areas"] if a["name"].lower() == args.area.lower()),
@@ -355,51 +432,54 @@ def main():
         if not area:
             print(f"❌ Area '{args.area}' not found")
             sys.exit(1)
+        to_explore = [area]
     else:
-        area = get_next_area(areas_data)
-        if not area:
+        to_explore = get_next_areas(areas_data, max(1, args.batch))
+        if not to_explore:
             print("✅ All areas have been explored!")
             sys.exit(0)
     
-    # Explore the area
-    updated_area = explore_area(area, dry_run=args.dry_run)
+    # Explore the area(s)
+    if len(to_explore) == 1:
+        results = [explore_area(to_explore[0], dry_run=args.dry_run, checkpoint=args.checkpoint)]
+    else:
+        print(f"🔀 Exploring {len(to_explore)} areas with {args.batch_workers} workers")
+        results = explore_areas(
+            to_explore,
+            dry_run=args.dry_run,
+            checkpoint=args.checkpoint,
+            max_workers=args.batch_workers,
+        )
+        if not results:
+            print("❌ All explorations failed")
+            sys.exit(1)
+    
+    explored = len([a for a in areas_data["areas"] if a["status"] == "explored"])
+    total = len(areas_data["areas"])
     
     if not args.dry_run:
-        # Update areas config
-        for i, a in enumerate(areas_data["areas"]):
-            if a["name"] == updated_area["name"]:
-                areas_data["areas"][i] = updated_area
-                break
-        
+        # explore_area updated the entries in areas_data in place, so one
+        # save covers the whole batch
         save_areas(areas_data)
         print(f"\n✅ Area status updated")
         
-        # Calculate stats for notification
-        explored = len([a for a in areas_data["areas"] if a["status"] == "explored"])
-        total = len(areas_data["areas"])
-
         # Send notification
         if not args.no_notify:
-            cache = json.loads(
-                (CACHE_DIR / f"area_{updated_area['name'].lower().replace(' ', '_')}.json").read_text()
-            )
             progress = {"explored": explored, "total": total}
-            message = format_telegram_message(updated_area, cache, progress)
 
             print("\n📱 Sending Telegram update...")
             try:
-                send_telegram_update(message)
+                if len(results) == 1:
+                    updated_area, cache = results[0]
+                    send_telegram_update(format_telegram_message(updated_area, cache, progress))
+                else:
+                    send_daily_summary([area for area, _ in results], progress)
                 print("✅ Notification sent!")
             except Exception as e:
                 print(f"⚠️ Notification failed: {e}")
                 print("   (Continuing anyway - logs saved)")
 
-        print(f"\n📊 Progress: {explored}/{total} areas explored")
-    else:
-        # Print stats for dry run
-        explored = len([a for a in areas_data["areas"] if a["status"] == "explored"])
-        total = len(areas_data["areas"])
-        print(f"\n📊 Progress: {explored}/{total} areas explored")
+    print(f"\n📊 Progress: {explored}/{total} areas explored")
 
 
 if __name__ == "__main__":
@@ -7,23 +7,26 @@ Usage:
     python scripts/find_commutable_areas.py --max-minutes 60
     python scripts/find_commutable_areas.py --refresh-stations
     python scripts/find_commutable_areas.py --check "AL1 1AA"
+    python scripts/find_commutable_areas.py --allow-partial  # save even if some lookups failed
 """
 
 import argparse
 import json
 import os
+import re
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from math import radians, sin, cos
 from pathlib import Path
 from typing import Optional
 
-import yaml
-
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from core.commute import CommuteChecker
+from core.commute import CommuteChecker, CommuteLookupError
 from core.stations import StationDatabase
+from core.yamlio import load_yaml, save_yaml
 
 # Paths
 BASE_DIR = Path(__file__).parent.parent
@@ -31,11 +34,22 @@ CONFIG_DIR = BASE_DIR / "config"
 DATA_DIR = BASE_DIR / "data"
 CACHE_DIR = DATA_DIR / "cache"
 
+# Concurrent routing API lookups (matches the HTTP client pool size)
+COMMUTE_MAX_WORKERS = 8
+
+# Candidate search radius around London
+CANDIDATE_RADIUS_KM = 150
+
+# Upper bound on straight-line km covered per minute of train time. The
+# fastest London commuter services (e.g. Peterborough-KX, ~123 km in
+# 45 min) average about 2.7, so stations further out than this can't
+# make the commute and aren't worth an API call.
+MAX_TRAIN_KM_PER_MIN = 3.0
+
 
 def load_criteria() -> dict:
     """Load search criteria from config."""
-    with open(CONFIG_DIR / "criteria.yaml") as f:
-        return yaml.safe_load(f)
+    return load_yaml(CONFIG_DIR / "criteria.yaml")
 
 
 def save_areas(areas: list) -> None:
@@ -45,69 +59,87 @@ def save_areas(areas: list) -> None:
     # Load existing to preserve manual additions
     existing = {}
     if areas_file.exists():
-        with open(areas_file) as f:
-            existing = yaml.safe_load(f) or {}
+        existing = load_yaml(areas_file) or {}
+    
+    # Nothing to write if the area list hasn't changed; leaving the file
+    # alone also keeps caches keyed on its mtime valid
+    if existing.get("areas") == areas:
+        print(f"✅ {len(areas)} areas unchanged in {areas_file}")
+        return
     
     existing["areas"] = areas
     existing["last_updated"] = datetime.now().isoformat()
     
-    with open(areas_file, "w") as f:
-        yaml.dump(existing, f, default_flow_style=False, sort_keys=False)
+    save_yaml(areas_file, existing)
     
     print(f"✅ Saved {len(areas)} areas to {areas_file}")
 
 
+# Central London (King's Cross) and roughly the Zone 4 boundary
+CENTRAL_LAT, CENTRAL_LNG = 51.5308, -0.1238
+ZONE_4_RADIUS_KM = 15
+
+# Known London Zone 1-4 keywords
+LONDON_KEYWORDS = [
+    'london ', 'kings cross', "king's cross", 'st pancras', 'euston', 'paddington',
+    'liverpool street', 'fenchurch', 'cannon street', 'waterloo', 'victoria',
+    'charing cross', 'blackfriars', 'moorgate', 'marylebone', 'old street',
+    'angel', 'bank', 'monument', 'tower', 'aldgate', 'shoreditch',
+    'whitechapel', 'stratford', 'west ham', 'canning town', 'canary wharf',
+    'greenwich', 'lewisham', 'peckham', 'brixton', 'clapham', 'battersea',
+    'vauxhall', 'elephant', 'borough', 'southwark', 'bermondsey',
+    'finsbury park', 'highbury', 'islington', 'hackney', 'dalston',
+    'bethnal green', 'mile end', 'bow', 'tottenham hale', 'seven sisters',
+    'camden', 'kentish town', 'hampstead', 'kilburn', 'willesden',
+    'cricklewood', 'west hampstead', 'finchley', 'barnet', 'edgware',
+    'harrow', 'wembley', 'ealing', 'acton', 'shepherd', 'hammersmith',
+    'fulham', 'putney', 'wandsworth', 'wimbledon', 'tooting', 'balham',
+    'streatham', 'tulse hill', 'herne hill', 'denmark hill', 'penge',
+    'crystal palace', 'sydenham', 'forest hill', 'catford', 'ladywell',
+    'brockley', 'new cross', 'deptford', 'surrey quays', 'canada water',
+    'rotherhithe', 'wapping', 'shadwell', 'limehouse', 'poplar',
+    'drayton park', 'essex road', 'hornsey', 'crouch hill', 'harringay'
+]
+_LONDON_KEYWORD_RE = re.compile("|".join(map(re.escape, LONDON_KEYWORDS)))
+
+# Haversine terms for the zone check, worked out once
+_CENTRAL_LAT_R = radians(CENTRAL_LAT)
+_CENTRAL_LNG_R = radians(CENTRAL_LNG)
+_COS_CENTRAL_LAT = cos(_CENTRAL_LAT_R)
+_ZONE_4_ANGLE = ZONE_4_RADIUS_KM / 6371
+_ZONE_4_TERM = sin(_ZONE_4_ANGLE / 2) ** 2
+
+
 def is_london_zone_1_4(name: str, station: str, lat: float, lng: float) -> bool:
     """
     Check if a station is in London Zones 1-4 (should be excluded).
     Uses keyword matching + distance from central London.
     """
-    from math import radians, sin, cos, sqrt, atan2
-    
-    # Central London (King's Cross)
-    CENTRAL_LAT, CENTRAL_LNG = 51.5308, -0.1238
-    MIN_DISTANCE_KM = 15  # Roughly Zone 4 boundary
-    
-    # Known London Zone 1-4 keywords
-    london_keywords = [
-        'london ', 'kings cross', "king's cross", 'st pancras', 'euston', 'paddington',
-        'liverpool street', 'fenchurch', 'cannon street', 'waterloo', 'victoria',
-        'charing cross', 'blackfriars', 'moorgate', 'marylebone', 'old street',
-        'angel', 'bank', 'monument', 'tower', 'aldgate', 'shoreditch',
-        'whitechapel', 'stratford', 'west ham', 'canning town', 'canary wharf',
-        'greenwich', 'lewisham', 'peckham', 'brixton', 'clapham', 'battersea',
-        'vauxhall', 'elephant', 'borough', 'southwark', 'bermondsey',
-        'finsbury park', 'highbury', 'islington', 'hackney', 'dalston',
-        'bethnal green', 'mile end', 'bow', 'tottenham hale', 'seven sisters',
-        'camden', 'kentish town', 'hampstead', 'kilburn', 'willesden',
-        'cricklewood', 'west hampstead', 'finchley', 'barnet', 'edgware',
-        'harrow', 'wembley', 'ealing', 'acton', 'shepherd', 'hammersmith',
-        'fulham', 'putney', 'wandsworth', 'wimbledon', 'tooting', 'balham',
-        'streatham', 'tulse hill', 'herne hill', 'denmark hill', 'penge',
-        'crystal palace', 'sydenham', 'forest hill', 'catford', 'ladywell',
-        'brockley', 'new cross', 'deptford', 'surrey quays', 'canada water',
-        'rotherhithe', 'wapping', 'shadwell', 'limehouse', 'poplar',
-        'drayton park', 'essex road', 'hornsey', 'crouch hill', 'harringay'
-    ]
-    
-    name_lower = name.lower()
-    station_lower = station.lower()
-    
-    # Check keywords
-    if any(kw in name_lower or kw in station_lower for kw in london_keywords):
+    # Check keywords (one regex pass over both names)
+    if _LONDON_KEYWORD_RE.search(f"{name.lower()}\n{station.lower()}"):
         return True
     
-    # Check distance (haversine)
-    R = 6371
-    lat1, lng1, lat2, lng2 = map(radians, [CENTRAL_LAT, CENTRAL_LNG, lat, lng])
-    dlat, dlng = lat2 - lat1, lng2 - lng1
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlng/2)**2
-    dist_km = 2 * R * atan2(sqrt(a), sqrt(1-a))
+    # Check distance. The latitude gap alone is a lower bound on the
+    # distance, so most stations are ruled out before any trig.
+    lat2 = radians(lat)
+    dlat = lat2 - _CENTRAL_LAT_R
+    if abs(dlat) >= _ZONE_4_ANGLE:
+        return False
+    
+    # Haversine 'a' term grows with distance, so compare it directly
+    # against the Zone 4 radius
+    dlng = radians(lng) - _CENTRAL_LNG_R
+    a = sin(dlat/2)**2 + _COS_CENTRAL_LAT * cos(lat2) * sin(dlng/2)**2
     
-    return dist_km < MIN_DISTANCE_KM
+    return a < _ZONE_4_TERM
+
 
+def station_area_name(station: dict) -> str:
+    """Area name for a station: its town, else the station name."""
+    return station["town"] or station["name"].replace(" Station", "")
 
-def find_commutable_stations(max_minutes: int, walking_buffer: int = 10) -> list:
+
+def find_commutable_stations(max_minutes: int, walking_buffer: int = 10) -> tuple:
     """
     Find all stations within commute time of King's Cross.
     Excludes London Zones 1-4 (focus on commuter belt).
@@ -117,7 +149,9 @@ def find_commutable_stations(max_minutes: int, walking_buffer: int = 10) -> list
         walking_buffer: Minutes to allow for walking to station
     
     Returns:
-        List of station dicts with commute times
+        tuple: (commutable, unchecked) - station dicts with commute times,
+               and names of stations whose commute time couldn't be
+               checked because the routing APIs failed
     """
     print(f"🔍 Finding stations within {max_minutes} min of King's Cross...")
     print(f"   (including {walking_buffer} min walking buffer)")
@@ -130,38 +164,66 @@ def find_commutable_stations(max_minutes: int, walking_buffer: int = 10) -> list
     commute_checker = CommuteChecker()
     
     # Get candidate stations (rough geographic filter first)
-    candidates = stations_db.get_stations_near_london(radius_km=150)
+    radius_km = min(CANDIDATE_RADIUS_KM, effective_max * MAX_TRAIN_KM_PER_MIN)
+    candidates = stations_db.get_stations_near_london(radius_km=radius_km)
     print(f"   Found {len(candidates)} candidate stations to check")
     
-    commutable = []
+    # Skip London Zones 1-4 up front, so they never cost a routing API call
+    candidates = [
+        station for station in candidates
+        if not is_london_zone_1_4(
+            station_area_name(station), station["name"], station["lat"], station["lng"]
+        )
+    ]
+    print(f"   {len(candidates)} remain outside London Zones 1-4")
     
-    for i, station in enumerate(candidates):
-        if (i + 1) % 50 == 0:
-            print(f"   Checking station {i + 1}/{len(candidates)}...")
-        
-        # Check cache first
+    # Cached times are answered locally; the rest go to the routing APIs
+    # concurrently. Results are only written to the cache from this thread.
+    train_times = {}
+    uncached = []
+    for station in candidates:
         cached = commute_checker.get_cached_time(station["name"])
         if cached is not None:
-            train_time = cached
+            train_times[station["name"]] = cached
         else:
-            # Query API
-            train_time = commute_checker.get_train_time_to_kx(
-                station["name"],
-                station["lat"],
-                station["lng"]
-            )
+            uncached.append(station)
+    
+    if uncached:
+        print(f"   Querying commute times for {len(uncached)} uncached stations...")
+    
+    def query_station(station: dict) -> Optional[int]:
+        return commute_checker.get_train_time_to_kx(
+            station["name"],
+            station["lat"],
+            station["lng"]
+        )
+    
+    unchecked = []
+    with ThreadPoolExecutor(max_workers=COMMUTE_MAX_WORKERS) as pool:
+        futures = {pool.submit(query_station, station): station for station in uncached}
+        for i, future in enumerate(as_completed(futures)):
+            if (i + 1) % 50 == 0:
+                print(f"   Checked {i + 1}/{len(uncached)} stations...")
+            
+            station = futures[future]
+            try:
+                train_time = future.result()
+            except CommuteLookupError as e:
+                unchecked.append(station["name"])
+                print(f"   ⚠️  Could not check {station['name']}: {e}")
+                continue
             if train_time is not None:
                 commute_checker.cache_time(station["name"], train_time)
+            train_times[station["name"]] = train_time
+    
+    commutable = []
+    
+    for station in candidates:
+        train_time = train_times.get(station["name"])
         
         if train_time is not None and train_time <= effective_max:
-            area_name = station["town"] or station["name"].replace(" Station", "")
-            
-            # Skip London Zones 1-4
-            if is_london_zone_1_4(area_name, station["name"], station["lat"], station["lng"]):
-                continue
-                
             commutable.append({
-                "name": area_name,
+                "name": station_area_name(station),
                 "station": station["name"],
                 "commute_minutes": train_time + walking_buffer,
                 "train_minutes": train_time,
@@ -172,11 +234,16 @@ def find_commutable_stations(max_minutes: int, walking_buffer: int = 10) -> list
                 "score": None,
             })
     
+    # Persist any commute times not yet flushed to disk
+    commute_checker.save()
+    
     # Sort by commute time
     commutable.sort(key=lambda x: x["commute_minutes"])
     
     print(f"✅ Found {len(commutable)} stations within {max_minutes} min commute")
-    return commutable
+    if unchecked:
+        print(f"⚠️  {len(unchecked)} stations could not be checked: {', '.join(sorted(unchecked))}")
+    return commutable, unchecked
 
 
 def check_postcode(postcode: str) -> None:
@@ -196,14 +263,18 @@ def check_postcode(postcode: str) -> None:
         return
     
     commute_checker = CommuteChecker()
-    train_time = commute_checker.get_train_time_to_kx(
-        station["name"],
-        station["lat"],
-        station["lng"]
-    )
+    try:
+        train_time = commute_checker.get_train_time_to_kx(
+            station["name"],
+            station["lat"],
+            station["lng"]
+        )
+    except CommuteLookupError as e:
+        print(f"❌ Could not calculate commute time: {e}")
+        return
     
     if train_time is None:
-        print("❌ Could not calculate commute time")
+        print("❌ No train route to King's Cross found")
         return
     
     walking_time = station.get("walking_minutes", 10)
@@ -229,6 +300,11 @@ def main():
     parser.add_argument("--refresh-stations", action="store_true", help="Refresh station data")
     parser.add_argument("--check", type=str, help="Check specific postcode")
     parser.add_argument("--output", type=str, default="config/areas.yaml", help="Output file")
+    parser.add_argument(
+        "--allow-partial",
+        action="store_true",
+        help="Save areas even if some stations could not be checked",
+    )
     
     args = parser.parse_args()
     
@@ -252,7 +328,14 @@ def main():
     walking_buffer = criteria["commute"].get("walking_buffer_minutes", 10)
     
     # Find commutable stations
-    areas = find_commutable_stations(max_minutes, walking_buffer)
+    areas, unchecked = find_commutable_stations(max_minutes, walking_buffer)
+    
+    # Don't replace the area list with an incomplete one. Times that were
+    # found are cached, so a re-run only retries the failed stations.
+    if unchecked and not args.allow_partial:
+        print(f"\n❌ Not saving: {len(unchecked)} stations could not be checked.")
+        print("   Re-run later, or pass --allow-partial to save anyway.")
+        sys.exit(1)
     
     # Save results
     save_areas(areas)
@@ -3,13 +3,21 @@ Home Finder Web UI
 Simple Flask app to track area exploration progress
 """
 
-import json
+import gzip
+import hashlib
 import os
+import sys
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
-from flask import Flask, render_template, jsonify, g
-import yaml
+from flask import Flask, Response, render_template, request, g
+import orjson
+
+# Add parent to path for core imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.yamlio import load_yaml as _load_yaml_file
 
 app = Flask(__name__)
 app.secret_key = os.getenv("FLASK_SECRET_KEY", "dev-key-change-me")
@@ -21,34 +29,70 @@ from auth_middleware import require_auth, get_current_user
 BASE_DIR = Path(__file__).parent.parent
 CONFIG_DIR = BASE_DIR / "config"
 CACHE_DIR = BASE_DIR / "data" / "cache"
+AREAS_FILE = CONFIG_DIR / "areas.yaml"
+
+
+# Parsed files are cached per (path, mtime), so a request only re-reads a
+# file after it has been rewritten. Cached values are shared between
+# requests - treat them as read-only.
+@lru_cache(maxsize=512)
+def _load_yaml_cached(path: str, mtime_ns: int) -> dict:
+    # core.yamlio keeps a pickled snapshot next to the other caches, so a
+    # fresh worker process skips the YAML parse too
+    return _load_yaml_file(path) or {}
+
+
+@lru_cache(maxsize=512)
+def _load_json_cached(path: str, mtime_ns: int) -> dict:
+    return orjson.loads(Path(path).read_bytes())
 
 
 def load_yaml(path: Path) -> dict:
     """Load YAML file safely."""
-    if not path.exists():
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
         return {}
-    with open(path) as f:
-        return yaml.safe_load(f) or {}
+    return _load_yaml_cached(str(path), mtime_ns)
 
 
 def load_json(path: Path) -> dict:
     """Load JSON file safely."""
-    if not path.exists():
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
         return {}
-    with open(path) as f:
-        return json.load(f)
+    return _load_json_cached(str(path), mtime_ns)
 
 
 def get_areas() -> list:
     """Get all areas with their status."""
-    areas_config = load_yaml(CONFIG_DIR / "areas.yaml")
+    areas_config = load_yaml(AREAS_FILE)
     return areas_config.get("areas", [])
 
 
+@lru_cache(maxsize=1)
+def _area_caches(mtime_ns: int) -> dict:
+    """
+    Load every area cache file, keyed by area slug.
+    
+    Rebuilt whenever the cache directory changes (cache files are written
+    by rename, which bumps its mtime). Unchanged files come straight from
+    load_json's per-file cache.
+    """
+    return {
+        path.stem[len("area_"):]: load_json(path)
+        for path in CACHE_DIR.glob("area_*.json")
+    }
+
+
 def get_area_cache(area_name: str) -> dict:
     """Get cached data for an area."""
-    cache_file = CACHE_DIR / f"area_{area_name.lower().replace(' ', '_')}.json"
-    return load_json(cache_file)
+    try:
+        mtime_ns = CACHE_DIR.stat().st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    return _area_caches(mtime_ns).get(area_name.lower().replace(' ', '_'), {})
 
 
 def get_criteria() -> dict:
@@ -56,33 +100,70 @@ def get_criteria() -> dict:
     return load_yaml(CONFIG_DIR / "criteria.yaml")
 
 
-def get_stats() -> dict:
-    """Get exploration statistics."""
+@lru_cache(maxsize=4)
+def _view_model(mtime_ns: int) -> dict:
+    """
+    Dashboard data derived from areas.yaml, built once per file version.
+
+    Holds the areas sorted by commute time, the status counts, a lookup
+    by lowercased name and the serialised /api/areas body (plain and
+    gzipped, with its ETag).
+    """
     areas = get_areas()
+    areas_json = orjson.dumps(areas)
+    
+    counts = {"explored": 0, "pending": 0, "skipped": 0}
+    by_name = {}
+    for area in areas:
+        status = area.get("status")
+        if status in counts:
+            counts[status] += 1
+        # First area wins if a name appears twice
+        by_name.setdefault(area.get("name", "").lower(), area)
+    
     return {
-        "total": len(areas),
-        "explored": len([a for a in areas if a.get("status") == "explored"]),
-        "pending": len([a for a in areas if a.get("status") == "pending"]),
-        "skipped": len([a for a in areas if a.get("status") == "skipped"]),
+        # Sort all areas by commute time (ascending) by default
+        "sorted_areas": sorted(areas, key=lambda x: x.get("commute_minutes", 999)),
+        "stats": {"total": len(areas), **counts},
+        "by_name": by_name,
+        "areas_json": areas_json,
+        # mtime=0 so every worker produces identical bytes
+        "areas_json_gz": gzip.compress(areas_json, compresslevel=6, mtime=0),
+        "areas_etag": hashlib.blake2b(areas_json, digest_size=16).hexdigest(),
     }
 
 
+def get_view_model() -> dict:
+    """Get the dashboard view model for the current areas.yaml."""
+    try:
+        mtime_ns = AREAS_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime_ns = 0
+    return _view_model(mtime_ns)
+
+
+def get_stats() -> dict:
+    """Get exploration statistics."""
+    return get_view_model()["stats"]
+
+
+def json_response(data, status: int = 200) -> Response:
+    """JSON response encoded with orjson."""
+    return Response(orjson.dumps(data), status=status, mimetype="application/json")
+
+
 @app.route("/")
 @require_auth
 def index():
     """Main dashboard."""
     criteria = get_criteria()
-    areas = get_areas()
-    stats = get_stats()
-    
-    # Sort all areas by commute time (ascending) by default
-    all_areas = sorted(areas, key=lambda x: x.get("commute_minutes", 999))
+    view = get_view_model()
     
     return render_template(
         "index.html",
         criteria=criteria,
-        all_areas=all_areas,
-        stats=stats,
+        all_areas=view["sorted_areas"],
+        stats=view["stats"],
         phase=criteria.get("phase", 1),
         last_updated=datetime.now().strftime("%Y-%m-%d %H:%M")
     )
@@ -92,8 +173,7 @@ def index():
 @require_auth
 def area_detail(name: str):
     """Detailed view of a single area."""
-    areas = get_areas()
-    area = next((a for a in areas if a.get("name", "").lower() == name.lower()), None)
+    area = get_view_model()["by_name"].get(name.lower())
     
     if not area:
         return "Area not found", 404
@@ -114,25 +194,40 @@ def area_detail(name: str):
 @app.route("/api/stats")
 def api_stats():
     """API endpoint for stats."""
-    return jsonify(get_stats())
+    return json_response(get_stats())
 
 
 @app.route("/api/areas")
 def api_areas():
     """API endpoint for all areas."""
-    return jsonify(get_areas())
+    view = get_view_model()
+    
+    # Already encoded (and compressed) once per areas.yaml version.
+    # quality() respects "gzip;q=0", which a plain `in` check doesn't.
+    if request.accept_encodings.quality("gzip") > 0:
+        response = Response(view["areas_json_gz"], mimetype="application/json")
+        response.headers["Content-Encoding"] = "gzip"
+        response.set_etag(view["areas_etag"] + "-gz")
+    else:
+        response = Response(view["areas_json"], mimetype="application/json")
+        response.set_etag(view["areas_etag"])
+    
+    # Both variants depend on Accept-Encoding, so shared caches must key on it
+    response.vary.add("Accept-Encoding")
+    
+    # 304 Not Modified when the client's If-None-Match matches
+    return response.make_conditional(request)
 
 
 @app.route("/api/area/<name>")
 def api_area(name: str):
     """API endpoint for single area."""
-    areas = get_areas()
-    area = next((a for a in areas if a.get("name", "").lower() == name.lower()), None)
+    area = get_view_model()["by_name"].get(name.lower())
     if not area:
-        return jsonify({"error": "not found"}), 404
+        return json_response({"error": "not found"}, 404)
     
     cache = get_area_cache(name)
-    return jsonify({**area, "cache": cache})
+    return json_response({**area, "cache": cache})
 
 
 if __name__ == "__main__":
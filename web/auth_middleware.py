@@ -3,7 +3,10 @@ Central Auth Middleware for Home Finder
 Checks authentication against auth.chinmaypandhare.uk
 """
 
+import atexit
 import os
+import threading
+import time
 from functools import wraps
 
 import httpx
@@ -13,6 +16,63 @@ AUTH_SERVICE = os.getenv("AUTH_SERVICE_URL", "https://auth.chinmaypandhare.uk")
 SERVICE_NAME = "homefinder"
 COOKIE_NAME = "ccp_auth_token"
 
+# Keep-alive connection pool to the auth service, shared by all requests
+_auth_client = httpx.Client(
+    http2=True,
+    timeout=10,
+    limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+)
+atexit.register(_auth_client.close)
+
+# Verification results per token: token -> (expiry, data)
+TOKEN_CACHE_TTL = 60  # seconds
+TOKEN_CACHE_MAX = 10_000
+_token_cache: dict = {}
+_token_cache_lock = threading.Lock()
+
+
+def _cached_verification(token: str):
+    """Get a still-fresh verification result for a token, or None."""
+    entry = _token_cache.get(token)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+
+def _cache_verification(token: str, data: dict) -> None:
+    """Remember a verification result for TOKEN_CACHE_TTL seconds."""
+    now = time.monotonic()
+    with _token_cache_lock:
+        if len(_token_cache) >= TOKEN_CACHE_MAX:
+            # Drop expired entries; start over if they're all still live
+            for key in [k for k, (expiry, _) in _token_cache.items() if expiry <= now]:
+                del _token_cache[key]
+            if len(_token_cache) >= TOKEN_CACHE_MAX:
+                _token_cache.clear()
+        _token_cache[token] = (now + TOKEN_CACHE_TTL, data)
+
+
+def verify_token(token: str) -> dict:
+    """
+    Verify a token with the auth service.
+    
+    Successful verifications are reused for TOKEN_CACHE_TTL seconds, so
+    repeat requests from the same session skip the round trip. Rejections
+    and error responses are never cached: a brief auth server failure
+    mustn't lock users out, and newly granted access takes effect at once.
+    """
+    data = _cached_verification(token)
+    if data is None:
+        response = _auth_client.get(
+            f"{AUTH_SERVICE}/api/verify",
+            params={"service": SERVICE_NAME},
+            headers={"Cookie": f"{COOKIE_NAME}={token}"},
+        )
+        data = response.json()
+        if response.status_code == 200 and data.get("valid"):
+            _cache_verification(token, data)
+    return data
+
 
 def require_auth(f):
     """
@@ -28,13 +88,7 @@ def require_auth(f):
         
         # Verify with auth service
         try:
-            response = httpx.get(
-                f"{AUTH_SERVICE}/api/verify",
-                params={"service": SERVICE_NAME},
-                cookies={COOKIE_NAME: token},
-                timeout=10,
-            )
-            data = response.json()
+            data = verify_token(token)
             
             if not data.get("valid"):
                 reason = data.get("reason", "unknown")
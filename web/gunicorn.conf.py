@@ -0,0 +1,22 @@
+"""
+Gunicorn config for serving the web UI.
+
+Usage:
+    gunicorn -c web/gunicorn.conf.py app:app
+
+Threaded workers let other requests proceed while one waits on the auth
+service; `python web/app.py` is the single-process dev server.
+"""
+
+import os
+from pathlib import Path
+
+# app.py imports auth_middleware as a sibling module
+chdir = str(Path(__file__).parent)
+
+bind = os.getenv("WEB_BIND", "0.0.0.0:5000")
+worker_class = "gthread"
+workers = int(os.getenv("WEB_WORKERS", "2"))
+threads = int(os.getenv("WEB_THREADS", "8"))
+timeout = 30
+keepalive = 5